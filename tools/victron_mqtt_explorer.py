@@ -5,15 +5,17 @@ Connects to Venus OS MQTT broker, discovers all topics and their structure,
 then generates optimized Telegraf configuration recommendations.
 
 Usage:
-    python3 victron_mqtt_explorer.py [--duration SECONDS]
+    python3 victron_mqtt_explorer.py [--duration SECONDS] [--watch]
 """
 
 import ssl
 import json
 import os
+import re
 import sys
+import time
 import argparse
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, field
@@ -25,24 +27,199 @@ except ImportError:
     print("Error: paho-mqtt not installed. Run: pip install paho-mqtt")
     sys.exit(1)
 
+# orjson is optional: it parses the raw payload bytes without a decode step
+# and is several times faster than the stdlib on busy brokers.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+# Most messages read off the socket before the run loop processes them
+_MAX_BATCH = 256
+
+# Venus OS publishes almost every value as {"value": <scalar>}
+_VALUE_PREFIX = b'{"value":'
+_JSON_LITERALS = {b'null': None, b'true': True, b'false': False}
+# Integers orjson returns exactly; anything wider comes back as a float
+_ORJSON_INT_MIN = -2.0 ** 63
+_ORJSON_INT_MAX = 2.0 ** 64
+_JSON_NUMBER_RE = re.compile(rb'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?')
+# Quotes, escapes and raw control characters need the full parser
+_JSON_STRING_SPECIAL_RE = re.compile(rb'[\x00-\x1f"\\]')
+
+
+def _parse_scalar(raw: bytes):
+    """Parse a bare JSON scalar; raise ValueError for anything else."""
+    if raw in _JSON_LITERALS:
+        return _JSON_LITERALS[raw]
+    first = raw[:1]
+    if first == b'"':
+        inner = raw[1:-1]
+        if len(raw) < 2 or raw[-1:] != b'"' or _JSON_STRING_SPECIAL_RE.search(inner):
+            raise ValueError(raw)
+        return inner.decode('utf-8')
+    number = _JSON_NUMBER_RE.fullmatch(raw)
+    if number is not None:
+        if number.group(1) or number.group(2):
+            return float(raw)
+        return int(raw)
+    raise ValueError(raw)
+
+
+def _decode_value(payload: bytes):
+    """Extract the "value" field from an MQTT payload."""
+    # Fast path: slice the scalar out instead of building a dict. Only pays off
+    # with the stdlib parser; orjson's C decoder beats any Python-level parsing.
+    if orjson is None and payload.startswith(_VALUE_PREFIX) and payload.endswith(b'}'):
+        try:
+            return _parse_scalar(payload[len(_VALUE_PREFIX):-1].strip())
+        except ValueError:
+            pass
+
+    try:
+        value = _json_loads(payload)
+        # Not every payload is an object, e.g. ["suppress-republish"] on R/ topics
+        if type(value) is dict:
+            value = value.get('value')
+        if orjson is None or type(value) is not float or _ORJSON_INT_MIN < value < _ORJSON_INT_MAX:
+            return value
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        if orjson is None:
+            return payload.decode('utf-8', errors='replace')
+
+    # orjson rejects NaN/Infinity and numbers beyond double range, and turns
+    # integers wider than 64 bits into floats; the stdlib handles all of these
+    try:
+        value = json.loads(payload)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return payload.decode('utf-8', errors='replace')
+    return value.get('value') if type(value) is dict else value
+
+
+# Static Telegraf config sections, joined with the generated parts in one pass
+_BASIC_PARSING_BLOCK = """\
+  data_format = "json_v2"
+
+  [[inputs.mqtt_consumer.json_v2]]
+    [[inputs.mqtt_consumer.json_v2.field]]
+      path = "value"
+      rename = "value"
+
+  # Topic parsing - extracts device_type as measurement
+  [[inputs.mqtt_consumer.topic_parsing]]
+    topic = "N/+/+/+/+"
+    measurement = "_/_/measurement/_/_"
+    tags = "_/portal_id/_/instance/field"
+
+  [[inputs.mqtt_consumer.topic_parsing]]
+    topic = "N/+/+/+/+/+"
+    measurement = "_/_/measurement/_/_/_"
+    tags = "_/portal_id/_/instance/field/subfield"
+
+  [[inputs.mqtt_consumer.topic_parsing]]
+    topic = "N/+/+/+/+/+/+"
+    measurement = "_/_/measurement/_/_/_/_"
+    tags = "_/portal_id/_/instance/field/subfield/subfield2"
+"""
+
+_OPTIMIZED_AGENT_BLOCK = """\
+[agent]
+  interval = "10s"
+  round_interval = true
+  metric_batch_size = 1000
+  metric_buffer_limit = 10000
+  flush_interval = "10s"
+
+###############################################################################
+#                            OUTPUT PLUGINS                                   #
+###############################################################################
+
+[[outputs.influxdb_v2]]
+  urls = ["${TELEGRAF_INFLUXDB_URL}"]
+  token = "${TELEGRAF_INFLUXDB_TOKEN}"
+  organization = "${TELEGRAF_INFLUXDB_ORG}"
+  bucket = "${TELEGRAF_INFLUXDB_BUCKET}"
+
+###############################################################################
+#                            INPUT PLUGINS                                    #
+###############################################################################
 
-@dataclass
+"""
+
+_OPTIMIZED_PARSING_BLOCK = """\
+  data_format = "json_v2"
+
+  [[inputs.mqtt_consumer.json_v2]]
+    [[inputs.mqtt_consumer.json_v2.field]]
+      path = "value"
+
+  # Parse instance from topic
+  [[inputs.mqtt_consumer.topic_parsing]]
+    topic = "N/+/+/+/+"
+    tags = "_/_/_/instance/field"
+
+  [[inputs.mqtt_consumer.topic_parsing]]
+    topic = "N/+/+/+/+/+"
+    tags = "_/_/_/instance/field/subfield"
+
+"""
+
+_OPTIMIZED_PROCESSORS_BLOCK = """\
+###############################################################################
+#                          PROCESSOR PLUGINS                                  #
+###############################################################################
+
+# Rename nested fields for easier querying
+[[processors.rename]]
+  [[processors.rename.replace]]
+    field = "value"
+    dest = "measurement_value"
+"""
+
+
+def _split_topic(topic: str):
+    """Slice device_type, instance and path out of an N/... topic.
+
+    Returns (None, None, None) when the topic has fewer than four levels.
+    """
+    if not topic.startswith('N/'):
+        return None, None, None
+    portal_end = topic.find('/', 2)
+    device_end = topic.find('/', portal_end + 1) if portal_end >= 0 else -1
+    if device_end < 0:
+        return None, None, None
+    instance_end = topic.find('/', device_end + 1)
+    if instance_end < 0:
+        return topic[portal_end + 1:device_end], topic[device_end + 1:], ''
+    return (topic[portal_end + 1:device_end], topic[device_end + 1:instance_end],
+            topic[instance_end + 1:])
+
+
+@dataclass(slots=True)
 class TopicData:
     """Stores information about a discovered topic."""
     topic: str
-    values: list = field(default_factory=list)
+    last_value: object = None
     value_types: set = field(default_factory=set)
-    first_seen: datetime = field(default_factory=datetime.now)
-    last_seen: datetime = field(default_factory=datetime.now)
+    # time.monotonic() readings; cheaper than building a datetime per message
+    first_seen: float = field(default_factory=time.monotonic)
+    last_seen: float = field(default_factory=time.monotonic)
     count: int = 0
+    # Topic structure, parsed once: N/<portal_id>/<device_type>/<instance>/<path...>
+    depth: int = field(default=0, init=False)
+    device_type: Optional[str] = field(default=None, init=False)
+    instance: str = field(default='', init=False)
+    path: str = field(default='', init=False)
 
-    def add_value(self, value):
-        self.count += 1
-        self.last_seen = datetime.now()
-        self.values.append(value)
-        if len(self.values) > 10:
-            self.values.pop(0)
-        self.value_types.add(type(value).__name__)
+    def __post_init__(self):
+        self.depth = self.topic.count('/') + 1
+        device_type, instance, path = _split_topic(self.topic)
+        if device_type is not None:
+            self.device_type = device_type
+            self.instance = instance
+            self.path = path
 
 
 class VictronMQTTExplorer:
@@ -61,10 +238,20 @@ class VictronMQTTExplorer:
 
         self.topics: dict[str, TopicData] = {}
         self.device_types: dict[str, set] = defaultdict(set)
-        self.measurements: dict[str, dict] = defaultdict(lambda: defaultdict(set))
+        self.measurements: dict[str, dict[str, set]] = {}
         self.running = True
         self.connected = False
         self.message_count = 0
+        # Telegraf topic wildcards, grown as new device types appear
+        self._topic_patterns: set[str] = set()
+        # Optimized-config input block per device type, with the instance count it was built for
+        self._device_block_cache: dict[str, tuple[int, str]] = {}
+        # Bumped whenever a device block is (re)built; lets --watch skip unchanged configs
+        self._device_block_builds = 0
+        self._watch_written_builds: Optional[int] = None
+        # Filled by _on_message during client.loop(); run() reads whatever is
+        # buffered on the socket (up to _MAX_BATCH) before draining it
+        self._pending: deque = deque()
 
         self.client = mqtt.Client(client_id="victron-explorer", protocol=mqtt.MQTTv311)
         self._setup_client()
@@ -109,37 +296,62 @@ class VictronMQTTExplorer:
             print(f"! Unexpected disconnection (code: {rc})")
 
     def _on_message(self, client, userdata, msg):
-        """Process incoming MQTT message."""
-        self.message_count += 1
-        topic = msg.topic
+        """Queue incoming MQTT message; the run loop processes it in batches."""
+        self._pending.append((msg.topic, msg.payload))
+
+    def _process_pending(self):
+        """Process all queued MQTT messages."""
+        # Kept on the network thread: this is pure-Python bookkeeping that the GIL
+        # serializes anyway (roughly 1-2 us per message, less in full batches), so
+        # worker threads would only add hand-off and locking on top of it, except
+        # on free-threaded builds.
+        # Bound once per batch. Batches are as large as the socket backlog, so
+        # this only amortizes when messages arrive faster than they are handled;
+        # on a quiet broker a batch is often a single message.
+        pending = self._pending
+        popleft = pending.popleft
+        topics = self.topics
+        topics_get = topics.get
+        device_types = self.device_types
+        measurements = self.measurements
+        decode_value = _decode_value
+        count = self.message_count
+        # The batch was read off the socket in one pass of the run loop, so its
+        # messages share one last_seen stamp (one clock read per batch, not per message)
+        now = time.monotonic()
 
         try:
-            payload = json.loads(msg.payload.decode('utf-8'))
-            value = payload.get('value')
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            value = msg.payload.decode('utf-8', errors='replace')
-
-        # Store topic data
-        if topic not in self.topics:
-            self.topics[topic] = TopicData(topic=topic)
-        self.topics[topic].add_value(value)
-
-        # Parse topic structure: N/<portal_id>/<device_type>/<instance>/<path...>
-        parts = topic.split('/')
-        if len(parts) >= 4 and parts[0] == 'N':
-            device_type = parts[2]
-            instance = parts[3]
-            path = '/'.join(parts[4:]) if len(parts) > 4 else ''
-
-            self.device_types[device_type].add(instance)
-
-            # Track fields per measurement
-            value_type = type(value).__name__ if value is not None else 'NoneType'
-            self.measurements[device_type][path].add(value_type)
-
-        # Progress indicator
-        if self.message_count % 100 == 0:
-            print(f"\r  Received {self.message_count} messages, {len(self.topics)} unique topics...", end='', flush=True)
+            for _ in range(len(pending)):
+                # Dequeue only once handled, so Ctrl+C mid-batch does not drop it
+                topic, payload = pending[0]
+                value = decode_value(payload)
+
+                # Store topic data; the topic is split only the first time it is seen
+                td = topics_get(topic)
+                if td is None:
+                    topic = sys.intern(topic)
+                    td = topics[topic] = TopicData(topic=topic)
+                    if td.device_type is not None:
+                        device_types[td.device_type].add(td.instance)
+                        self._topic_patterns.add(f"N/{self.portal_id}/{td.device_type}/#")
+
+                td.count += 1
+                td.last_seen = now
+                td.last_value = value
+
+                # Track fields per measurement, only when this topic shows a new type
+                value_types = td.value_types
+                value_type = type(value).__name__
+                if value_type not in value_types:
+                    value_types.add(value_type)
+                    if td.device_type is not None:
+                        paths = measurements.setdefault(td.device_type, {})
+                        paths.setdefault(td.path, set()).add(value_type)
+
+                popleft()
+                count += 1
+        finally:
+            self.message_count = count
 
     def connect(self):
         """Connect to MQTT broker."""
@@ -158,26 +370,59 @@ class VictronMQTTExplorer:
             return False
         return True
 
-    def run(self, duration: int = 30):
-        """Run the explorer for specified duration."""
-        import time
+    def run(self, duration: int = 30, watch_dir: Optional[str] = None):
+        """Run the explorer for specified duration.
 
+        With watch_dir, run until interrupted instead and refresh the
+        optimized config in that directory every duration seconds.
+        """
         if not self.connect():
             return
 
-        self.client.loop_start()
-
-        print(f"\nCollecting data for {duration} seconds...")
+        if watch_dir:
+            print(f"\nWatching, config refreshed every {duration} seconds (Ctrl+C to stop)...")
+        else:
+            print(f"\nCollecting data for {duration} seconds...")
         start_time = time.time()
+        last_progress = now = start_time
+        pending = self._pending
 
+        # Network I/O runs on this thread instead of a loop_start() worker,
+        # so messages are read and processed without a thread hand-off
         try:
-            while time.time() - start_time < duration and self.running:
-                time.sleep(0.5)
+            while (watch_dir or now - start_time < duration) and self.running:
+                rc = self.client.loop(timeout=0.5)
+                # loop() reads a single QoS 0 packet per call; keep reading what is
+                # already buffered, without blocking, so each batch is worth processing
+                while rc == mqtt.MQTT_ERR_SUCCESS and len(pending) < _MAX_BATCH:
+                    queued = len(pending)
+                    rc = self.client.loop(timeout=0)
+                    if len(pending) == queued:
+                        break
+                # _on_connect clears running when the broker refuses us; don't retry then
+                if rc != mqtt.MQTT_ERR_SUCCESS and self.running:
+                    time.sleep(1)
+                    try:
+                        self.client.reconnect()
+                    except OSError:
+                        pass
+                self._process_pending()
+                now = time.time()
+
+                # Progress indicator, refreshed at most once per second
+                if now - last_progress >= 1:
+                    last_progress = now
+                    print(f"\r  Received {self.message_count} messages, {len(self.topics)} unique topics...",
+                          end='', flush=True)
+
+                if watch_dir and now - start_time >= duration:
+                    start_time = now
+                    self.save_watch_config(watch_dir)
         except KeyboardInterrupt:
             print("\n\nStopped by user.")
 
-        self.client.loop_stop()
         self.client.disconnect()
+        self._process_pending()
         print(f"\n\n✓ Collection complete: {self.message_count} messages, {len(self.topics)} topics")
 
     def print_report(self):
@@ -218,214 +463,127 @@ class VictronMQTTExplorer:
         print(f"\n\nSAMPLE VALUES (last received):")
         print("-" * 40)
 
-        important_fields = ['Soc', 'Voltage', 'Current', 'Power', 'Temperature', 'State']
+        important_fields = frozenset({'Soc', 'Voltage', 'Current', 'Power', 'Temperature', 'State'})
         for topic, data in sorted(self.topics.items()):
-            path_parts = topic.split('/')
-            if len(path_parts) > 4:
-                field_name = path_parts[-1]
+            if data.depth > 4:
+                field_name = topic.rpartition('/')[2]
                 if field_name in important_fields:
-                    last_value = data.values[-1] if data.values else 'N/A'
+                    last_value = data.last_value if data.count else 'N/A'
                     print(f"  {topic}")
                     print(f"    → {last_value} (seen {data.count}x)")
 
     def generate_telegraf_config(self) -> str:
         """Generate optimized Telegraf configuration."""
-        config_lines = []
-
-        # Header
-        config_lines.extend([
-            "# Telegraf Configuration - Victron Energy",
-            f"# Auto-generated by victron_mqtt_explorer.py",
-            f"# Generated: {datetime.now().isoformat()}",
-            f"# Portal ID: {self.portal_id}",
-            "",
-        ])
-
-        # Determine max topic depth
-        max_depth = 0
-        for topic in self.topics.keys():
-            depth = len(topic.split('/'))
-            max_depth = max(max_depth, depth)
-
-        # Generate topic patterns based on actual data
-        topic_patterns = set()
-        for topic in self.topics.keys():
-            parts = topic.split('/')
-            if len(parts) >= 4 and parts[0] == 'N':
-                device_type = parts[2]
-                # Create wildcard pattern for this device type
-                topic_patterns.add(f"N/{self.portal_id}/{device_type}/#")
-
-        # MQTT Consumer config
-        config_lines.extend([
-            "[[inputs.mqtt_consumer]]",
-            f'  servers = ["{self._get_mqtt_url()}"]',
-            "",
-            '  client_id = "telegraf-victron"',
-            "  qos = 0",
-            '  connection_timeout = "30s"',
-            "",
-        ])
+        # Topic patterns (one wildcard per device type) are collected as topics arrive
+        topics_block = ''.join(f'    "{pattern}",\n' for pattern in sorted(self._topic_patterns))
 
-        if self.username:
-            config_lines.extend([
-                f'  username = "{self.username}"',
-                f'  password = "{self.password}"',
-                "",
-            ])
+        header = f"""\
+# Telegraf Configuration - Victron Energy
+# Auto-generated by victron_mqtt_explorer.py
+# Generated: {datetime.now().isoformat()}
+# Portal ID: {self.portal_id}
 
-        if self.use_ssl and self.insecure:
-            config_lines.append("  insecure_skip_verify = true")
-            config_lines.append("")
-
-        # Topics
-        config_lines.append("  topics = [")
-        for pattern in sorted(topic_patterns):
-            config_lines.append(f'    "{pattern}",')
-        config_lines.append("  ]")
-        config_lines.append("")
-
-        # Data format
-        config_lines.extend([
-            '  data_format = "json_v2"',
-            "",
-            "  [[inputs.mqtt_consumer.json_v2]]",
-            '    [[inputs.mqtt_consumer.json_v2.field]]',
-            '      path = "value"',
-            '      rename = "value"',
-            "",
-        ])
-
-        # Topic parsing rules for different depths
-        config_lines.extend([
-            "  # Topic parsing - extracts device_type as measurement",
-            "  [[inputs.mqtt_consumer.topic_parsing]]",
-            '    topic = "N/+/+/+/+"',
-            '    measurement = "_/_/measurement/_/_"',
-            '    tags = "_/portal_id/_/instance/field"',
-            "",
-            "  [[inputs.mqtt_consumer.topic_parsing]]",
-            '    topic = "N/+/+/+/+/+"',
-            '    measurement = "_/_/measurement/_/_/_"',
-            '    tags = "_/portal_id/_/instance/field/subfield"',
-            "",
-            "  [[inputs.mqtt_consumer.topic_parsing]]",
-            '    topic = "N/+/+/+/+/+/+"',
-            '    measurement = "_/_/measurement/_/_/_/_"',
-            '    tags = "_/portal_id/_/instance/field/subfield/subfield2"',
-            "",
-        ])
-
-        return '\n'.join(config_lines)
+[[inputs.mqtt_consumer]]
+  servers = ["{self._get_mqtt_url()}"]
+
+  client_id = "telegraf-victron"
+  qos = 0
+  connection_timeout = "30s"
+
+"""
+        topics = f"""\
+  topics = [
+{topics_block}  ]
+
+"""
+        return ''.join([header, self._get_auth_block(), topics, _BASIC_PARSING_BLOCK])
 
     def generate_optimized_config(self) -> str:
         """Generate a more optimized config with processors for better data organization."""
+        header = f"""\
+# Optimized Telegraf Configuration for Victron Energy
+# Auto-generated: {datetime.now().isoformat()}
+# Portal ID: {self.portal_id}
+#
+# This configuration:
+#   - Flattens nested paths into field names
+#   - Converts string values to appropriate types
+#   - Groups related metrics for easier querying
+
+[global_tags]
+  portal_id = "{self.portal_id}"
+
+{_OPTIMIZED_AGENT_BLOCK}"""
+        sections = [header]
+        mqtt_url = self._get_mqtt_url()
+        auth_block = self._get_auth_block()
+
+        # Generate separate input for each device type for better control.
+        # Blocks only change when a device type gains instances, so reuse them.
+        for device_type in sorted(self.device_types.keys()):
+            instances = self.device_types[device_type]
+            cached = self._device_block_cache.get(device_type)
+            if cached is not None and cached[0] == len(instances):
+                sections.append(cached[1])
+                continue
+
+            block = f"""\
+# {device_type.upper()} - instances: {', '.join(sorted(instances))}
+[[inputs.mqtt_consumer]]
+  name_override = "{device_type}"
+  servers = ["{mqtt_url}"]
+  client_id = "telegraf-victron-{device_type}"
+  qos = 0
+
+{auth_block}  topics = [
+    "N/{self.portal_id}/{device_type}/#",
+  ]
+
+{_OPTIMIZED_PARSING_BLOCK}"""
+            self._device_block_cache[device_type] = (len(instances), block)
+            self._device_block_builds += 1
+            sections.append(block)
 
-        lines = [
-            "# Optimized Telegraf Configuration for Victron Energy",
-            f"# Auto-generated: {datetime.now().isoformat()}",
-            f"# Portal ID: {self.portal_id}",
-            "#",
-            "# This configuration:",
-            "#   - Flattens nested paths into field names",
-            "#   - Converts string values to appropriate types",
-            "#   - Groups related metrics for easier querying",
-            "",
-            "[global_tags]",
-            f'  portal_id = "{self.portal_id}"',
-            "",
-            "[agent]",
-            '  interval = "10s"',
-            "  round_interval = true",
-            "  metric_batch_size = 1000",
-            "  metric_buffer_limit = 10000",
-            '  flush_interval = "10s"',
-            "",
-            "###############################################################################",
-            "#                            OUTPUT PLUGINS                                   #",
-            "###############################################################################",
-            "",
-            "[[outputs.influxdb_v2]]",
-            '  urls = ["${TELEGRAF_INFLUXDB_URL}"]',
-            '  token = "${TELEGRAF_INFLUXDB_TOKEN}"',
-            '  organization = "${TELEGRAF_INFLUXDB_ORG}"',
-            '  bucket = "${TELEGRAF_INFLUXDB_BUCKET}"',
-            "",
-            "###############################################################################",
-            "#                            INPUT PLUGINS                                    #",
-            "###############################################################################",
-            "",
-        ]
+        # Add string processor to convert known string fields
+        sections.append(_OPTIMIZED_PROCESSORS_BLOCK)
 
-        # Generate separate input for each device type for better control
-        for device_type in sorted(self.device_types.keys()):
-            instances = sorted(self.device_types[device_type])
-            paths = self.measurements[device_type]
+        return ''.join(sections)
 
-            lines.extend([
-                f"# {device_type.upper()} - instances: {', '.join(instances)}",
-                "[[inputs.mqtt_consumer]]",
-                f'  name_override = "{device_type}"',
-                f'  servers = ["{self._get_mqtt_url()}"]',
-                '  client_id = "telegraf-victron-' + device_type + '"',
-                "  qos = 0",
-                "",
-            ])
-
-            if self.username:
-                lines.extend([
-                    f'  username = "{self.username}"',
-                    f'  password = "{self.password}"',
-                    "",
-                ])
-
-            if self.use_ssl and self.insecure:
-                lines.append("  insecure_skip_verify = true")
-                lines.append("")
-
-            lines.extend([
-                "  topics = [",
-                f'    "N/{self.portal_id}/{device_type}/#",',
-                "  ]",
-                "",
-                '  data_format = "json_v2"',
-                "",
-                "  [[inputs.mqtt_consumer.json_v2]]",
-                '    [[inputs.mqtt_consumer.json_v2.field]]',
-                '      path = "value"',
-                "",
-                "  # Parse instance from topic",
-                "  [[inputs.mqtt_consumer.topic_parsing]]",
-                '    topic = "N/+/+/+/+"',
-                '    tags = "_/_/_/instance/field"',
-                "",
-                "  [[inputs.mqtt_consumer.topic_parsing]]",
-                '    topic = "N/+/+/+/+/+"',
-                '    tags = "_/_/_/instance/field/subfield"',
-                "",
-            ])
+    def _get_auth_block(self) -> str:
+        """Get credentials/TLS lines shared by every mqtt_consumer input."""
+        block = ''
+        if self.username:
+            block += f'''  username = "{self.username}"
+  password = "{self.password}"
 
-        # Add string processor to convert known string fields
-        lines.extend([
-            "###############################################################################",
-            "#                          PROCESSOR PLUGINS                                  #",
-            "###############################################################################",
-            "",
-            "# Rename nested fields for easier querying",
-            "[[processors.rename]]",
-            "  [[processors.rename.replace]]",
-            '    field = "value"',
-            '    dest = "measurement_value"',
-            "",
-        ])
-
-        return '\n'.join(lines)
+'''
+        if self.use_ssl and self.insecure:
+            block += "  insecure_skip_verify = true\n\n"
+        return block
 
     def _get_mqtt_url(self) -> str:
         """Get MQTT URL in correct format."""
         protocol = "ssl" if self.use_ssl else "tcp"
         return f"{protocol}://{self.server}:{self.port}"
 
+    def save_watch_config(self, output_dir: str = "."):
+        """Rewrite the optimized config under a fixed name for --watch mode."""
+        config = self.generate_optimized_config()
+        # Only the header timestamp would differ; don't trigger a Telegraf reload for that
+        if self._device_block_builds == self._watch_written_builds:
+            return
+
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        config_file = output_path / "telegraf_victron_optimized.conf"
+        # Write aside and rename, so readers never see a truncated config
+        tmp_file = config_file.with_name(config_file.name + ".tmp")
+        with open(tmp_file, 'w') as f:
+            f.write(config)
+        os.replace(tmp_file, config_file)
+        self._watch_written_builds = self._device_block_builds
+        print(f"\n✓ Optimized Telegraf config refreshed: {config_file}")
+
     def save_report(self, output_dir: str = "."):
         """Save all reports and configs to files."""
         output_path = Path(output_dir)
@@ -434,18 +592,21 @@ class VictronMQTTExplorer:
 
         # Save topic list
         topics_file = output_path / f"victron_topics_{timestamp}.txt"
-        with open(topics_file, 'w') as f:
-            f.write(f"# Victron MQTT Topics discovered at {datetime.now().isoformat()}\n")
-            f.write(f"# Portal ID: {self.portal_id}\n")
-            f.write(f"# Total: {len(self.topics)} topics\n\n")
-
-            for topic in sorted(self.topics.keys()):
-                data = self.topics[topic]
-                last_val = data.values[-1] if data.values else 'N/A'
-                f.write(f"{topic}\n")
-                f.write(f"  last_value: {last_val}\n")
-                f.write(f"  types: {', '.join(data.value_types)}\n")
-                f.write(f"  count: {data.count}\n\n")
+        lines = [
+            f"# Victron MQTT Topics discovered at {datetime.now().isoformat()}\n",
+            f"# Portal ID: {self.portal_id}\n",
+            f"# Total: {len(self.topics)} topics\n\n",
+        ]
+        for topic, data in sorted(self.topics.items()):
+            last_val = data.last_value if data.count else 'N/A'
+            lines.append(
+                f"{topic}\n"
+                f"  last_value: {last_val}\n"
+                f"  types: {', '.join(data.value_types)}\n"
+                f"  count: {data.count}\n\n"
+            )
+        with open(topics_file, 'wb') as f:
+            f.write(''.join(lines).encode('utf-8'))
 
         print(f"✓ Topics saved to: {topics_file}")
 
@@ -470,30 +631,37 @@ class VictronMQTTExplorer:
             "discovered_at": datetime.now().isoformat(),
             "total_messages": self.message_count,
             "total_topics": len(self.topics),
-            "device_types": {k: list(v) for k, v in self.device_types.items()},
+            # Sets become sorted lists so the output is deterministic
+            "device_types": {k: sorted(v) for k, v in self.device_types.items()},
             "measurements": {
-                device: {path: list(types) for path, types in paths.items()}
+                device: {path: sorted(types) for path, types in paths.items()}
                 for device, paths in self.measurements.items()
             },
         }
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        if orjson is not None:
+            with open(summary_file, 'wb') as f:
+                f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        else:
+            with open(summary_file, 'w') as f:
+                json.dump(summary, f, indent=2, sort_keys=True)
         print(f"✓ JSON summary saved to: {summary_file}")
 
 
+# KEY=value lines; blank lines and comments never match
+_ENV_LINE_RE = re.compile(rb'^[ \t]*([^#\s=][^=\n]*?)[ \t]*=([^\n]*)$', re.MULTILINE)
+
+
 def load_env_file(env_path: str = ".env") -> dict:
     """Load environment variables from .env file."""
-    env_vars = {}
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    # Remove quotes
-                    value = value.strip('"').strip("'")
-                    env_vars[key] = value
-    return env_vars
+    if not os.path.exists(env_path):
+        return {}
+    with open(env_path, 'rb') as f:
+        data = f.read()
+    # Remove surrounding whitespace and quotes from values
+    return {
+        m.group(1).decode('utf-8'): m.group(2).decode('utf-8').strip().strip('"').strip("'")
+        for m in _ENV_LINE_RE.finditer(data)
+    }
 
 
 def main():
@@ -507,6 +675,9 @@ def main():
     parser.add_argument("--server", type=str, help="MQTT server (overrides .env)")
     parser.add_argument("--port", type=int, help="MQTT port (overrides .env)")
     parser.add_argument("--portal-id", type=str, help="Victron Portal ID (overrides .env)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep collecting until Ctrl+C, refreshing the optimized config "
+                             "in the output directory every --duration seconds")
 
     args = parser.parse_args()
 
@@ -542,7 +713,7 @@ def main():
         insecure=insecure
     )
 
-    explorer.run(duration=args.duration)
+    explorer.run(duration=args.duration, watch_dir=args.output if args.watch else None)
     explorer.print_report()
     explorer.save_report(args.output)
 